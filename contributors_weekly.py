@@ -1,17 +1,48 @@
 #!/usr/bin/env python3
 # contributors_weekly.py
 # Count unique contributors per week using the GitHub Commits API (accurate, no snapshots needed).
+# Optionally (--source stats) use GitHub's pre-aggregated /stats/contributors instead: one small
+# request, but Sunday-based weeks, login-only identities and only the top contributors.
 
 import os
+import re
+import sys
 import csv
 import time
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from collections import defaultdict
+from collections import Counter
+from urllib.parse import parse_qs, urlsplit
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson as _json
+except ImportError:  # orjson is optional; stdlib json parses the same payloads, just slower
+    import json as _json
+
+try:
+    import requests_cache
+except ImportError:  # optional; only needed for --http-cache
+    requests_cache = None
 
 COMMITS_URL = "https://api.github.com/repos/{owner}/{repo}/commits"
+STATS_URL = "https://api.github.com/repos/{owner}/{repo}/stats/contributors"
+STATS_ATTEMPTS = 6
+MAX_RETRIES = 5
+DAY = 86400
+# Transport level: only 502/503/504. urllib3 would otherwise also retry any 413/429/503 that
+# carries Retry-After, stacking its attempts under each of gh_get's; rate limits belong to
+# gh_get alone. raise_on_status=False hands the final response back to the normal error handling.
+TRANSPORT_RETRY = Retry(total=5, backoff_factor=0.5, status_forcelist=(502, 503, 504),
+                        respect_retry_after_header=False,
+                        allowed_methods=frozenset({"GET", "POST"}), raise_on_status=False)
+
+def _loads(r):
+    return _json.loads(r.content)
 
 def gh_headers(token: str | None):
     h = {"Accept": "application/vnd.github+json"}
@@ -19,41 +50,194 @@ def gh_headers(token: str | None):
         h["Authorization"] = f"Bearer {token}"
     return h
 
-def monday_bucket(dt: datetime) -> datetime:
-    dt = dt.astimezone(timezone.utc)
-    monday = dt - timedelta(days=dt.weekday())
-    return datetime(monday.year, monday.month, monday.day, tzinfo=timezone.utc)
+def monday_epoch(epoch: int) -> int:
+    """Epoch seconds of 00:00Z on the Monday of epoch's week (1970-01-01 was a Thursday)."""
+    day = epoch // DAY
+    return (day - (day + 3) % 7) * DAY
+
+def iso_z(epoch: int) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(epoch))
+
+_ISO_RE = re.compile(r"(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})Z")
+# Keyed by the "YYYY-MM-DD" prefix: timestamps are UTC, so the date alone fixes the week.
+# Bounded by the number of days in the window, and hit by every commit after a day's first.
+_WEEK_CACHE: dict[str, int] = {}
+
+def parse_iso_z(ts: str) -> datetime:
+    # Precompiled fixed-format match; much cheaper than strptime and, unlike
+    # plain slicing, still rejects anything that is not "YYYY-MM-DDTHH:MM:SSZ"
+    m = _ISO_RE.fullmatch(ts)
+    if m is None:
+        raise ValueError(f"not a GitHub UTC timestamp: {ts!r}")
+    return datetime(*map(int, m.groups()), tzinfo=timezone.utc)
+
+def week_key(ts: str) -> int:
+    """Monday bucket (epoch seconds) containing the timestamp string ts; formatted only at write time."""
+    day = ts[:10]
+    k = _WEEK_CACHE.get(day)
+    if k is None:
+        k = monday_epoch(int(parse_iso_z(ts).timestamp()))
+        _WEEK_CACHE[day] = k
+    return k
+
+def _commit_ts(c):
+    try:
+        return c["commit"]["author"]["date"]
+    except (KeyError, TypeError):
+        return None
+
+def _commit_login(c):
+    try:
+        return c["author"]["login"]
+    except (KeyError, TypeError):
+        return None
+
+def _commit_email(c):
+    try:
+        return c["commit"]["author"]["email"]
+    except (KeyError, TypeError):
+        return None
+
+def make_session(cache_path=None, workers=8):
+    if cache_path:
+        if requests_cache is None:
+            raise SystemExit("--http-cache requires the requests-cache package (pip install requests-cache)")
+        # GitHub answers If-None-Match revalidations with 304, which is free of rate-limit cost
+        session = requests_cache.CachedSession(cache_path, backend="sqlite", cache_control=True, expire_after=3600)
+    else:
+        session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=TRANSPORT_RETRY))
+    return session
+
+def is_rate_limited(r):
+    if r.status_code == 429:
+        return True
+    if r.status_code != 403:
+        return False
+    return ("Retry-After" in r.headers
+            or r.headers.get("X-RateLimit-Remaining") == "0"
+            or "rate limit" in r.text.lower())
+
+def retry_delay(r, attempt):
+    """Seconds to wait before retrying a rate-limited response."""
+    retry_after = r.headers.get("Retry-After")
+    if retry_after:
+        return float(retry_after)
+    reset = r.headers.get("X-RateLimit-Reset")
+    if r.headers.get("X-RateLimit-Remaining") == "0" and reset:
+        return max(0.0, int(reset) - time.time()) + 1
+    return min(2 ** attempt, 60)
+
+def gh_get(session, url, headers, params=None):
+    """GET with exponential backoff on 403/429 rate-limit responses."""
+    for attempt in range(MAX_RETRIES + 1):
+        r = session.get(url, headers=headers, params=params, timeout=30)
+        if attempt == MAX_RETRIES or not is_rate_limited(r):
+            return r
+        time.sleep(retry_delay(r, attempt))
 
-def iso_z(dt: datetime) -> str:
-    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+def last_page(r) -> int:
+    """Page count advertised by the rel="last" Link header (1 if there is only one page)."""
+    last = r.links.get("last", {}).get("url")
+    if not last:
+        return 1
+    return int(parse_qs(urlsplit(last).query)["page"][0])
 
-def fetch_commits(owner, repo, since_iso, until_iso, token, per_page=100, max_pages=100, pause=0.2):
-    session = requests.Session()
+def fetch_commits(owner, repo, since_iso, until_iso, token, per_page=100, max_pages=100, cache_path=None, workers=8):
+    session = make_session(cache_path, workers)
     headers = gh_headers(token)
     url = COMMITS_URL.format(owner=owner, repo=repo)
-    all_commits = []
-    for page in range(1, max_pages + 1):
-        r = session.get(
-            url,
-            headers=headers,
-            params={"since": since_iso, "until": until_iso, "per_page": per_page, "page": page},
-            timeout=30,
-        )
+
+    def fetch_page(page):
+        r = gh_get(session, url, headers,
+                   params={"since": since_iso, "until": until_iso, "per_page": per_page, "page": page})
         if r.status_code != 200:
             try:
                 err = r.json()
             except Exception:
                 err = r.text
             raise SystemExit(f"GitHub commits error {r.status_code} page {page}:\n{err}")
-        items = r.json()
-        if not isinstance(items, list) or not items:
-            break
-        all_commits.extend(items)
-        if len(items) < per_page:
-            break
-        time.sleep(pause)
+        items = _loads(r)
+        return r, items if isinstance(items, list) else []
+
+    # Page 1 tells us how many pages there are; fetch the rest concurrently
+    r, all_commits = fetch_page(1)
+    n_pages = min(max_pages, last_page(r)) if all_commits else 1
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for _, items in pool.map(fetch_page, range(2, n_pages + 1)):
+            all_commits.extend(items)
     return all_commits
 
+def fetch_contributor_stats(owner, repo, token, cache_path=None):
+    session = make_session(cache_path)
+    url = STATS_URL.format(owner=owner, repo=repo)
+    for attempt in range(STATS_ATTEMPTS):
+        r = gh_get(session, url, gh_headers(token))
+        if r.status_code == 202:
+            # GitHub is still computing the statistics in the background; poll again
+            time.sleep(2 ** attempt)
+            continue
+        if r.status_code != 200:
+            try:
+                err = r.json()
+            except Exception:
+                err = r.text
+            raise SystemExit(f"GitHub contributor stats error {r.status_code}:\n{err}")
+        stats = _loads(r)
+        return stats if isinstance(stats, list) else []
+    raise SystemExit("GitHub is still computing contributor stats (HTTP 202); try again in a minute.")
+
+def count_commit_contributors(commits, exclude_bots=False) -> Counter:
+    """Unique contributors (login/email) per Monday bucket (UTC) from raw commits."""
+    # one flat set of (week, ident) pairs, counted per week afterwards
+    pairs: set[tuple[int, str]] = set()
+    for c in commits:
+        # commit timestamp
+        ts = _commit_ts(c)
+        if not ts:
+            continue
+        try:
+            key = week_key(ts)
+        except ValueError:
+            continue
+
+        # contributor identity: prefer GitHub login; fallback to commit email
+        login = _commit_login(c)
+        ident = login or _commit_email(c)
+        if not ident:
+            continue
+        # the same login recurs across thousands of commits; share one str object
+        ident = sys.intern(ident)
+
+        # optional bot filter
+        if exclude_bots and isinstance(login, str) and login.endswith("[bot]"):
+            continue
+
+        pairs.add((key, ident))
+
+    return Counter(key for key, _ in pairs)
+
+def count_stats_contributors(stats, start_date, end_date, exclude_bots=False) -> Counter:
+    """
+    Unique contributors per week from /stats/contributors.
+    GitHub's weeks start on Sunday 00:00Z; each is labelled with the following
+    Monday, which shares six of its seven days with the commit-based buckets.
+    """
+    first = monday_epoch(int(datetime(start_date.year, start_date.month, start_date.day, tzinfo=timezone.utc).timestamp()))
+    last = int(datetime(end_date.year, end_date.month, end_date.day, tzinfo=timezone.utc).timestamp())
+    counts = Counter()
+    for contrib in stats:
+        login = (contrib.get("author") or {}).get("login")
+        if exclude_bots and isinstance(login, str) and login.endswith("[bot]"):
+            continue
+        for wk in contrib.get("weeks", ()):
+            if not wk.get("c"):
+                continue
+            monday = wk["w"] + DAY
+            if first <= monday <= last:
+                counts[monday] += 1
+    return counts
+
 def main():
     ap = argparse.ArgumentParser(description="Generate weekly unique contributors CSV from GitHub commits.")
     ap.add_argument("--owner", required=True, help="Repository owner/org (e.g., valkey-io)")
@@ -64,7 +248,13 @@ def main():
     ap.add_argument("--until", help="End date YYYY-MM-DD (UTC). Defaults to today.")
     ap.add_argument("--out", required=True, help="Output CSV path (e.g., contributors_weekly.csv)")
     ap.add_argument("--token", default=os.getenv("GITHUB_TOKEN"), help="GitHub token (or set GITHUB_TOKEN)")
+    ap.add_argument("--http-cache", metavar="PATH",
+                    help="Cache GitHub responses in this SQLite file and revalidate them with ETags (requires requests-cache)")
+    ap.add_argument("--workers", type=int, default=8, help="Max concurrent commit page requests")
     ap.add_argument("--exclude-bots", action="store_true", help="Exclude authors whose login ends with [bot]")
+    ap.add_argument("--source", choices=["commits", "stats"], default="commits",
+                    help="commits: exact, from every commit (default). stats: one request to /stats/contributors; "
+                         "Sunday-based weeks, GitHub logins only, top contributors only.")
     args = ap.parse_args()
 
     today = datetime.now(timezone.utc).date()
@@ -78,40 +268,22 @@ def main():
     until_iso_dt = datetime(end_date.year, end_date.month, end_date.day, tzinfo=timezone.utc) + timedelta(days=1)
     until_iso = until_iso_dt.strftime("%Y-%m-%dT%H:%M:%SZ")
 
-    commits = fetch_commits(args.owner, args.repo, since_iso, until_iso, args.token)
-
-    # Aggregate unique contributors (login/email) per Monday bucket (UTC)
-    buckets: dict[str, set] = defaultdict(set)
-    for c in commits:
-        # commit timestamp
-        try:
-            ts = c["commit"]["author"]["date"]
-            dt = datetime.strptime(ts, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
-        except Exception:
-            continue
-
-        # contributor identity: prefer GitHub login; fallback to commit email
-        login = (c.get("author") or {}).get("login")
-        email = (c.get("commit") or {}).get("author", {}).get("email")
-        ident = login or email
-        if not ident:
-            continue
-
-        # optional bot filter
-        if args.exclude_bots and isinstance(login, str) and login.endswith("[bot]"):
-            continue
-
-        key = iso_z(monday_bucket(dt))
-        buckets[key].add(ident)
+    if args.source == "stats":
+        stats = fetch_contributor_stats(args.owner, args.repo, args.token, cache_path=args.http_cache)
+        buckets = count_stats_contributors(stats, start_date, end_date, args.exclude_bots)
+    else:
+        commits = fetch_commits(args.owner, args.repo, since_iso, until_iso, args.token, cache_path=args.http_cache,
+                                workers=args.workers)
+        buckets = count_commit_contributors(commits, args.exclude_bots)
 
     # Write CSV
-    rows = sorted((k, len(v)) for k, v in buckets.items())
+    keys = sorted(buckets)
     with open(args.out, "w", newline="", encoding="utf-8") as f:
         w = csv.writer(f)
         w.writerow(["time", "count"])
-        w.writerows(rows)
+        w.writerows((iso_z(k), buckets[k]) for k in keys)
 
-    print(f"Wrote {len(rows)} rows to {args.out}")
+    print(f"Wrote {len(keys)} rows to {args.out}")
 
 if __name__ == "__main__":
     main()
@@ -8,20 +8,53 @@ Usage:
 
 Notes:
 - Uses the Search API (`/search/issues`) with correct space-separated qualifiers.
-- For `--metric merged`, this script fetches each PR to read `merged_at`.
+- Date ranges are only split (in halves) when a query would exceed the Search API's
+  1,000-result cap, so low-volume windows cost a single query.
+- For `--metric merged`, `merged_at` comes from the search results' `pull_request`
+  field; PRs missing it are looked up in GraphQL batches of 100 when a token is
+  available, otherwise with one REST call per PR.
+- Search pages and per-PR lookups are fetched concurrently (see --workers);
+  rate-limited responses (403/429) are retried after the delay GitHub asks for.
 - Respects GITHUB_TOKEN env var if --token is not supplied (recommended to increase rate limit).
 """
 import os
+import re
+import sys
 import csv
 import time
+import calendar
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from collections import defaultdict
+from collections import Counter
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson as _json
+except ImportError:  # orjson is optional; stdlib json parses the same payloads, just slower
+    import json as _json
+
+try:
+    import requests_cache
+except ImportError:  # optional; only needed for --http-cache
+    requests_cache = None
 
 SEARCH_URL = "https://api.github.com/search/issues"
 PULL_URL_TPL = "https://api.github.com/repos/{owner}/{repo}/pulls/{number}"
+GRAPHQL_URL = "https://api.github.com/graphql"
+GRAPHQL_BATCH = 100
+SEARCH_CAP = 1000
+DAY = 86400
+MAX_RETRIES = 5
+# Transport level: only 502/503/504. urllib3 would otherwise also retry any 413/429/503 that
+# carries Retry-After, stacking its attempts under each of gh_get's; rate limits belong to
+# gh_get alone. raise_on_status=False hands the final response back to the normal error handling.
+TRANSPORT_RETRY = Retry(total=5, backoff_factor=0.5, status_forcelist=(502, 503, 504),
+                        respect_retry_after_header=False,
+                        allowed_methods=frozenset({"GET", "POST"}), raise_on_status=False)
 
 def parse_args():
     p = argparse.ArgumentParser(description="Export PR trends to CSV")
@@ -38,9 +71,14 @@ def parse_args():
     p.add_argument("--out", required=True, help="Output CSV path")
     p.add_argument("--token", default=os.getenv("GITHUB_TOKEN"), help="GitHub token (or set GITHUB_TOKEN)")
     p.add_argument("--max-pages", type=int, default=10, help="Max pages per search (100 results/page)")
-    p.add_argument("--pause", type=float, default=0.2, help="Pause between paginated requests (seconds)")
-    p.add_argument("--chunk-days", type=int, default=30,
-                   help="Split the query range into N-day chunks to avoid Search API 1,000 result cap")
+    p.add_argument("--pause", type=float, default=None,
+                   help="Deprecated and ignored; requests are throttled by --workers and rate-limit backoff")
+    p.add_argument("--workers", type=int, default=8, help="Max concurrent GitHub API requests")
+    p.add_argument("--http-cache", metavar="PATH",
+                   help="Cache GitHub responses in this SQLite file and revalidate them with ETags (requires requests-cache)")
+    p.add_argument("--chunk-days", type=int, default=None,
+                   help="Optionally pre-split the query range into N-day chunks; ranges over the "
+                        "Search API 1,000 result cap are split automatically either way")
     return p.parse_args()
 
 def to_date(s: str):
@@ -77,87 +115,227 @@ def build_query(owner, repo, metric, start, end):
     # merged
     return f"{base} is:merged merged:{start}..{end}"
 
-def bucket_key(dt: datetime, bucket: str) -> str:
-    dt = dt.astimezone(timezone.utc)
+_ISO_RE = re.compile(r"(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})Z")
+# Per bucket size, keyed by the "YYYY-MM-DD" prefix: timestamps are UTC and every bucket is
+# whole days, so the date alone fixes the bucket. Bounded by the days in the window.
+_KEY_CACHE: dict[str, dict[str, int]] = {}
+
+def parse_iso_z(ts: str) -> datetime:
+    # Precompiled fixed-format match; much cheaper than strptime and, unlike
+    # plain slicing, still rejects anything that is not "YYYY-MM-DDTHH:MM:SSZ"
+    m = _ISO_RE.fullmatch(ts)
+    if m is None:
+        raise ValueError(f"not a GitHub UTC timestamp: {ts!r}")
+    return datetime(*map(int, m.groups()), tzinfo=timezone.utc)
+
+def bucket_key_for(ts: str, bucket: str) -> int:
+    """bucket_start() for a raw timestamp string, cached per bucket size and day."""
+    cache = _KEY_CACHE.setdefault(bucket, {})
+    day = ts[:10]
+    k = cache.get(day)
+    if k is None:
+        k = bucket_start(int(parse_iso_z(ts).timestamp()), bucket)
+        cache[day] = k
+    return k
+
+def bucket_start(epoch: int, bucket: str) -> int:
+    """Start of the bucket containing epoch, in epoch seconds (UTC)."""
     if bucket == "daily":
-        b = datetime(dt.year, dt.month, dt.day, tzinfo=timezone.utc)
-    elif bucket == "weekly":
-        monday = dt - timedelta(days=dt.weekday())
-        b = datetime(monday.year, monday.month, monday.day, tzinfo=timezone.utc)
-    else:
-        b = datetime(dt.year, dt.month, 1, tzinfo=timezone.utc)
+        return epoch - epoch % DAY
+    if bucket == "weekly":
+        # 1970-01-01 was a Thursday, so day + 3 is days since a Monday
+        day = epoch // DAY
+        return (day - (day + 3) % 7) * DAY
+    t = time.gmtime(epoch)
+    return calendar.timegm((t.tm_year, t.tm_mon, 1, 0, 0, 0))
+
+def iso_z(epoch: int) -> str:
     # Grafana-friendly ISO8601 with Z
-    return b.strftime("%Y-%m-%dT%H:%M:%SZ")
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(epoch))
 
-def fetch_search(session, query, token, per_page=100, max_pages=10, pause=0.2):
+def _loads(r):
+    return _json.loads(r.content)
+
+def gh_headers(token):
     headers = {"Accept": "application/vnd.github+json"}
     if token:
         headers["Authorization"] = f"Bearer {token}"
+    return headers
+
+def make_session(workers, cache_path=None):
+    if cache_path:
+        if requests_cache is None:
+            raise SystemExit("--http-cache requires the requests-cache package (pip install requests-cache)")
+        # GitHub answers If-None-Match revalidations with 304, which is free of rate-limit cost
+        session = requests_cache.CachedSession(cache_path, backend="sqlite", cache_control=True, expire_after=3600)
+    else:
+        session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=TRANSPORT_RETRY)
+    session.mount("https://", adapter)
+    return session
+
+def graphql_rate_limited(r):
+    """GraphQL reports an exhausted limit as HTTP 200 with errors[].type == "RATE_LIMITED"."""
+    if b"RATE_LIMITED" not in r.content and r.headers.get("X-RateLimit-Remaining") != "0":
+        return False
+    try:
+        errors = _loads(r).get("errors") or []
+    except (ValueError, AttributeError):
+        return False
+    # Remaining == 0 on its own is a successful last request; it only counts alongside errors
+    return bool(errors) and (r.headers.get("X-RateLimit-Remaining") == "0"
+                             or any(e.get("type") == "RATE_LIMITED" for e in errors if isinstance(e, dict)))
+
+def is_rate_limited(r):
+    if r.status_code == 429:
+        return True
+    if r.status_code != 403:
+        return graphql_rate_limited(r)
+    return ("Retry-After" in r.headers
+            or r.headers.get("X-RateLimit-Remaining") == "0"
+            or "rate limit" in r.text.lower())
+
+def retry_delay(r, attempt):
+    """Seconds to wait before retrying a rate-limited response."""
+    retry_after = r.headers.get("Retry-After")
+    if retry_after:
+        return float(retry_after)
+    reset = r.headers.get("X-RateLimit-Reset")
+    if r.headers.get("X-RateLimit-Remaining") == "0" and reset:
+        return max(0.0, int(reset) - time.time()) + 1
+    return min(2 ** attempt, 60)
+
+def gh_request(session, method, url, headers, **kwargs):
+    """Send a request with exponential backoff on rate-limit responses (403/429, or GraphQL RATE_LIMITED)."""
+    for attempt in range(MAX_RETRIES + 1):
+        r = session.request(method, url, headers=headers, timeout=30, **kwargs)
+        if attempt == MAX_RETRIES or not is_rate_limited(r):
+            return r
+        time.sleep(retry_delay(r, attempt))
+
+def gh_get(session, url, headers, params=None):
+    return gh_request(session, "GET", url, headers, params=params)
+
+def fetch_search_page(session, query, page, token, per_page=100):
+    r = gh_get(session, SEARCH_URL, gh_headers(token),
+               params={"q": query, "per_page": per_page, "page": page})
+    if r.status_code != 200:
+        # Surface GitHub's JSON error payload if available
+        try:
+            err = r.json()
+        except Exception:
+            err = r.text
+        raise SystemExit(f"GitHub search error {r.status_code} for query `{query}` page {page}:\n{err}")
+    return _loads(r)
+
+def fetch_search(pool, session, build, ranges, token, per_page=100, max_pages=10):
+    """
+    Search build(start, end) over each (start, end) date range and return all items.
+    Page 1 of every range is fetched concurrently. A range whose total_count exceeds
+    the Search API cap is split in half and retried; the rest keep their page 1 and
+    have their remaining pages fetched in one more concurrent round.
+    """
+    one_day = timedelta(days=1)
+    pending = list(ranges)
+    accepted = []  # (query, page 1 payload)
+    while pending:
+        queries = [build(start, end) for start, end in pending]
+        firsts = pool.map(lambda q: fetch_search_page(session, q, 1, token, per_page), queries)
+        split = []
+        for (start, end), q, data in zip(pending, queries, firsts):
+            if data.get("total_count", 0) > SEARCH_CAP and start < end:
+                mid = start + (end - start) // 2
+                split += [(start, mid), (mid + one_day, end)]
+            else:
+                accepted.append((q, data))
+        pending = split
+
+    rest = []
+    for q, data in accepted:
+        n_pages = min(max_pages, -(-data.get("total_count", 0) // per_page))
+        rest += [(q, page) for page in range(2, n_pages + 1)]
+    pages = pool.map(lambda qp: fetch_search_page(session, qp[0], qp[1], token, per_page), rest)
     all_items = []
-    for page in range(1, max_pages + 1):
-        r = session.get(SEARCH_URL, headers=headers,
-                        params={"q": query, "per_page": per_page, "page": page},
-                        timeout=30)
-        if r.status_code != 200:
-            # Surface GitHub's JSON error payload if available
-            try:
-                err = r.json()
-            except Exception:
-                err = r.text
-            raise SystemExit(f"GitHub search error {r.status_code} for query `{query}` page {page}:\n{err}")
-        data = r.json()
-        items = data.get("items", [])
-        all_items += items
-        if len(items) < per_page:
-            break
-        time.sleep(pause)
+    for _, data in accepted:
+        all_items += data.get("items", [])
+    for data in pages:
+        all_items += data.get("items", [])
     return all_items
 
 def fetch_pull_merged_at(session, owner, repo, number, token):
-    headers = {"Accept": "application/vnd.github+json"}
-    if token:
-        headers["Authorization"] = f"Bearer {token}"
     url = PULL_URL_TPL.format(owner=owner, repo=repo, number=number)
-    r = session.get(url, headers=headers, timeout=30)
+    r = gh_get(session, url, gh_headers(token))
     if r.status_code != 200:
         try:
             err = r.json()
         except Exception:
             err = r.text
         raise SystemExit(f"GitHub PR fetch error {r.status_code} for PR #{number}:\n{err}")
-    return r.json().get("merged_at")
+    return _loads(r).get("merged_at")
+
+def graphql_merged_at(session, owner, repo, numbers, token):
+    """Return {number: merged_at} for up to GRAPHQL_BATCH PRs in a single GraphQL query."""
+    fields = " ".join(f"pr{n}: pullRequest(number: {n}) {{ mergedAt }}" for n in numbers)
+    query = f"query($owner: String!, $name: String!) {{ repository(owner: $owner, name: $name) {{ {fields} }} }}"
+    r = gh_request(session, "POST", GRAPHQL_URL, gh_headers(token),
+                   json={"query": query, "variables": {"owner": owner, "name": repo}})
+    body = _loads(r) if r.status_code == 200 else None
+    repo_data = ((body or {}).get("data") or {}).get("repository")
+    if repo_data is None:
+        err = (body or {}).get("errors") or r.text
+        raise SystemExit(f"GitHub GraphQL error {r.status_code} for PRs #{numbers[0]}..#{numbers[-1]}:\n{err}")
+    return {n: (repo_data.get(f"pr{n}") or {}).get("mergedAt") for n in numbers}
+
+def fetch_merged_at(pool, session, owner, repo, numbers, token):
+    """Return merged_at for each PR number, in order."""
+    if not token:
+        # GraphQL requires authentication; fall back to one REST call per PR
+        return list(pool.map(lambda num: fetch_pull_merged_at(session, owner, repo, num, token), numbers))
+    batches = [numbers[i:i + GRAPHQL_BATCH] for i in range(0, len(numbers), GRAPHQL_BATCH)]
+    merged_at_by_num = {}
+    for found in pool.map(lambda b: graphql_merged_at(session, owner, repo, b, token), batches):
+        merged_at_by_num.update(found)
+    return [merged_at_by_num[n] for n in numbers]
 
 def main():
     a = parse_args()
+    if a.pause is not None:
+        print("warning: --pause is deprecated and has no effect; use --workers to limit concurrency",
+              file=sys.stderr)
     start_date, end_date = calc_range(a)
 
-    counts = defaultdict(int)
-    session = requests.Session()
-
-    for chunk_start, chunk_end in daterange_chunks(start_date, end_date, a.chunk_days):
-        q = build_query(a.owner, a.repo, a.metric, chunk_start, chunk_end)
-        items = fetch_search(session, q, a.token, max_pages=a.max_pages, pause=a.pause)
-        # Process items
-        for it in items:
-            if a.metric == "opened":
-                ts = it.get("created_at")
-            elif a.metric == "closed":
-                ts = it.get("closed_at")
-            else:  # merged
-                num = it.get("number")
-                ts = fetch_pull_merged_at(session, a.owner, a.repo, num, a.token) if num is not None else None
-            if not ts:
-                continue
-            dt = datetime.strptime(ts, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
-            key = bucket_key(dt, a.bucket)
-            counts[key] += 1
-
-    rows = sorted(counts.items())
+    counts = Counter()
+    session = make_session(a.workers, a.http_cache)
+
+    with ThreadPoolExecutor(max_workers=a.workers) as pool:
+        ranges = (list(daterange_chunks(start_date, end_date, a.chunk_days)) if a.chunk_days
+                  else [(start_date, end_date)])
+        items = fetch_search(pool, session, lambda s, e: build_query(a.owner, a.repo, a.metric, s, e),
+                             ranges, a.token, max_pages=a.max_pages)
+        if a.metric == "opened":
+            stamps = [it.get("created_at") for it in items]
+        elif a.metric == "closed":
+            stamps = [it.get("closed_at") for it in items]
+        else:  # merged
+            # Search hits for is:merged normally carry pull_request.merged_at already;
+            # only PRs without it need a lookup.
+            stamps = [(it.get("pull_request") or {}).get("merged_at") for it in items]
+            numbers = [it["number"] for it, ts in zip(items, stamps) if ts is None and it.get("number") is not None]
+            stamps = [ts for ts in stamps if ts is not None]
+            stamps += fetch_merged_at(pool, session, a.owner, a.repo, numbers, a.token)
+
+    # Process items: Counter tallies the raw strings in C, then each distinct
+    # timestamp is bucketed once
+    for ts, n in Counter(stamps).items():
+        if ts:
+            counts[bucket_key_for(ts, a.bucket)] += n
+
+    keys = sorted(counts)
     with open(a.out, "w", newline="", encoding="utf-8") as f:
         w = csv.writer(f)
         w.writerow(["time", "count"])
-        w.writerows(rows)
-    print(f"Wrote {len(rows)} rows to {a.out}")
+        w.writerows((iso_z(k), counts[k]) for k in keys)
+    print(f"Wrote {len(keys)} rows to {a.out}")
 
 if __name__ == "__main__":
     main()
@@ -10,23 +10,66 @@
 # - Multi-label support via --labels "label1,label2,Label With Spaces"
 #   -> emits label-<slug>_opened_weekly.csv and label-<slug>_closed_weekly.csv for each label.
 # - Backwards compatible: --enhancement-label still works if --labels is not provided.
+# - All searches (plus the commit and release listings) are fetched concurrently
+#   via a thread pool (--workers); rate-limited responses are retried with backoff.
+# - PR, issue and label metrics each come from a single "updated" search over the window,
+#   split in halves only where a range exceeds the Search API's 1000-result cap;
+#   opened/closed/merged buckets are derived locally from the item timestamps.
 
 import os
+import re
 import sys
 import csv
 import time
 import argparse
-from collections import defaultdict
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, date, timedelta
+from operator import methodcaller
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Optional, Tuple, Dict, Iterable
+from urllib.parse import parse_qs, urlsplit
+
+try:
+    import orjson as _json
+except ImportError:  # orjson is optional; stdlib json parses the same payloads, just slower
+    import json as _json
+
+try:
+    import requests_cache
+except ImportError:  # optional; only needed for --http-cache
+    requests_cache = None
 
 # -----------------------------
 # HTTP helpers
 # -----------------------------
 
-def make_session(token: Optional[str]) -> requests.Session:
-    s = requests.Session()
+MAX_RETRIES = 5
+GRAPHQL_URL = "https://api.github.com/graphql"
+GRAPHQL_BATCH = 100
+# Transport level: only 502/503/504. urllib3 would otherwise also retry any 413/429/503 that
+# carries Retry-After, stacking its attempts under each of gh_get's; rate limits belong to
+# gh_get alone. raise_on_status=False hands the final response back to the normal error handling.
+TRANSPORT_RETRY = Retry(total=5, backoff_factor=0.5, status_forcelist=(502, 503, 504),
+                        respect_retry_after_header=False,
+                        allowed_methods=frozenset({"GET", "POST"}), raise_on_status=False)
+
+def _loads(r: requests.Response):
+    return _json.loads(r.content)
+
+def make_session(token: Optional[str], workers: int = 8, cache_path: Optional[str] = None) -> requests.Session:
+    if cache_path:
+        if requests_cache is None:
+            raise SystemExit("--http-cache requires the requests-cache package (pip install requests-cache)")
+        # GitHub answers If-None-Match revalidations with 304, which is free of rate-limit cost
+        s = requests_cache.CachedSession(cache_path, backend="sqlite", cache_control=True, expire_after=3600)
+    else:
+        s = requests.Session()
+    # main()'s pool and list_commits' page pool (nested inside it) each run up to `workers`
+    # requests, so keep room for both; otherwise urllib3 drops the surplus keep-alive sockets
+    s.mount("https://", HTTPAdapter(pool_connections=workers, pool_maxsize=2 * workers, max_retries=TRANSPORT_RETRY))
     headers = {
         "Accept": "application/vnd.github+json",
         "User-Agent": "github-weekly-trends/1.1",
@@ -36,10 +79,52 @@ def make_session(token: Optional[str]) -> requests.Session:
     s.headers.update(headers)
     return s
 
+def graphql_rate_limited(r: requests.Response) -> bool:
+    """GraphQL reports an exhausted limit as HTTP 200 with errors[].type == "RATE_LIMITED"."""
+    if b"RATE_LIMITED" not in r.content and r.headers.get("X-RateLimit-Remaining") != "0":
+        return False
+    try:
+        errors = _loads(r).get("errors") or []
+    except (ValueError, AttributeError):
+        return False
+    # Remaining == 0 on its own is a successful last request; it only counts alongside errors
+    return bool(errors) and (r.headers.get("X-RateLimit-Remaining") == "0"
+                             or any(e.get("type") == "RATE_LIMITED" for e in errors if isinstance(e, dict)))
+
+def is_rate_limited(r: requests.Response) -> bool:
+    if r.status_code == 429:
+        return True
+    if r.status_code != 403:
+        return graphql_rate_limited(r)
+    return ("Retry-After" in r.headers
+            or r.headers.get("X-RateLimit-Remaining") == "0"
+            or "rate limit" in r.text.lower())
+
+def retry_delay(r: requests.Response, attempt: int) -> float:
+    """Seconds to wait before retrying a rate-limited response."""
+    retry_after = r.headers.get("Retry-After")
+    if retry_after:
+        return float(retry_after)
+    reset = r.headers.get("X-RateLimit-Reset")
+    if r.headers.get("X-RateLimit-Remaining") == "0" and reset:
+        return max(0.0, int(reset) - time.time()) + 1
+    return min(2 ** attempt, 60)
+
+def gh_request(session: requests.Session, method: str, url: str, timeout: int = 30, **kwargs) -> requests.Response:
+    """Send a request with exponential backoff on rate-limit responses (403/429, or GraphQL RATE_LIMITED)."""
+    for attempt in range(MAX_RETRIES + 1):
+        r = session.request(method, url, timeout=timeout, **kwargs)
+        if attempt == MAX_RETRIES or not is_rate_limited(r):
+            return r
+        time.sleep(retry_delay(r, attempt))
+
+def gh_get(session: requests.Session, url: str, params: Optional[dict] = None, timeout: int = 30) -> requests.Response:
+    return gh_request(session, "GET", url, timeout=timeout, params=params)
+
 def get_json(session: requests.Session, url: str, params: Optional[dict] = None, timeout: int = 30):
-    r = session.get(url, params=params or {}, timeout=timeout)
+    r = gh_get(session, url, params=params or {}, timeout=timeout)
     r.raise_for_status()
-    return r.json(), r.links
+    return _loads(r), r.links
 
 # -----------------------------
 # Date helpers
@@ -48,48 +133,81 @@ def get_json(session: requests.Session, url: str, params: Optional[dict] = None,
 def today_utc_date() -> date:
     return datetime.now(timezone.utc).date()
 
-def monday_bucket(dtime: datetime) -> date:
-    """Return the Monday (as date) for the week containing dtime."""
-    d = dtime.date()
-    return d - timedelta(days=d.weekday())
+DAY = 86400
+
+def monday_epoch(epoch: int) -> int:
+    """Epoch seconds of 00:00Z on the Monday of epoch's week (1970-01-01 was a Thursday)."""
+    day = epoch // DAY
+    return (day - (day + 3) % 7) * DAY
 
 def month_bucket(dtime: datetime) -> date:
     """Return the first day of the month (as date) for dtime."""
     d = dtime.date()
     return date(d.year, d.month, 1)
 
+_ISO_RE = re.compile(r"(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})Z")
+# Keyed by the "YYYY-MM-DD" prefix: timestamps are UTC, so the date alone fixes the week.
+# Bounded by the days in the window and shared by search results and commits.
+_WEEK_CACHE: Dict[str, int] = {}
+
 def parse_iso_z(ts: str) -> datetime:
     # ts like "2025-09-12T12:35:18Z"
-    return datetime.strptime(ts, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+    # Precompiled fixed-format match; much cheaper than strptime and, unlike
+    # plain slicing, still rejects anything that is not "YYYY-MM-DDTHH:MM:SSZ"
+    m = _ISO_RE.fullmatch(ts)
+    if m is None:
+        raise ValueError(f"not a GitHub UTC timestamp: {ts!r}")
+    return datetime(*map(int, m.groups()), tzinfo=timezone.utc)
+
+def week_of(ts: str) -> int:
+    """Monday bucket (epoch seconds) for a raw timestamp string; write_csv formats it."""
+    day = ts[:10]
+    wk = _WEEK_CACHE.get(day)
+    if wk is None:
+        wk = monday_epoch(int(parse_iso_z(ts).timestamp()))
+        _WEEK_CACHE[day] = wk
+    return wk
+
+def count_weekly(stamps: Iterable[Optional[str]], lo: str, hi: str) -> Dict[int, int]:
+    """
+    Count timestamp strings per Monday bucket, keeping only those whose
+    date part lies in [lo, hi] (inclusive ISO dates).
+    Counter tallies identical strings in C first, so each distinct
+    timestamp is window-checked and bucketed once regardless of how
+    often it occurs.
+    """
+    weekly = defaultdict(int)
+    for ts, n in Counter(stamps).items():
+        if ts and lo <= ts[:10] <= hi:
+            weekly[week_of(ts)] += n
+    return weekly
 
 # -----------------------------
-# Writing CSVs (robust to date/datetime/str keys)
+# Writing CSVs (robust to epoch/date/datetime keys)
 # -----------------------------
 
+def _formatter_for(k):
+    """
+    Pick the label formatter for a counter's key type once; counters are
+    built homogeneously, so the first key decides for every row.
+    """
+    if isinstance(k, int):
+        return lambda x: time.strftime("%Y-%m-%dT00:00:00Z", time.gmtime(x))
+    if isinstance(k, datetime):
+        return lambda x: x.astimezone(timezone.utc).strftime("%Y-%m-%dT00:00:00Z")
+    if isinstance(k, date):
+        return lambda x: f"{x.year:04d}-{x.month:02d}-{x.day:02d}T00:00:00Z"
+    raise TypeError(f"Unsupported key type in write_csv: {type(k)}")
+
 def write_csv(path: str, counter: Dict) -> None:
-    rows = sorted(counter.items())
+    keys = sorted(counter)
     with open(path, "w", newline="", encoding="utf-8") as f:
         w = csv.writer(f)
         w.writerow(["time", "count"])
-        for k, v in rows:
-            # Accept keys as date, datetime, or ISO string
-            if isinstance(k, date) and not isinstance(k, datetime):
-                dt = datetime(k.year, k.month, k.day, 0, 0, 0, tzinfo=timezone.utc)
-            elif isinstance(k, datetime):
-                dt = k.astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
-            elif isinstance(k, str):
-                # Try strict ISO first, then YYYY-MM-DD
-                try:
-                    parsed = datetime.fromisoformat(k.replace("Z", "+00:00"))
-                except Exception:
-                    parsed = datetime.strptime(k, "%Y-%m-%d")
-                dt = parsed.replace(tzinfo=timezone.utc, hour=0, minute=0, second=0, microsecond=0)
-            else:
-                raise TypeError(f"Unsupported key type in write_csv: {type(k)}")
-
-            iso_label = dt.strftime("%Y-%m-%dT00:00:00Z")
-            w.writerow([iso_label, v])
-    print(f"Wrote {len(rows)} rows to {path}")
+        if keys:
+            fmt = _formatter_for(keys[0])
+            w.writerows((fmt(k), counter[k]) for k in keys)
+    print(f"Wrote {len(keys)} rows to {path}")
 
 # -----------------------------
 # Range & chunking
@@ -117,7 +235,8 @@ def daterange_chunks(start: date, end: date, chunk_days: int) -> Iterable[Tuple[
 
 def build_query_pr(owner, repo, which, start_date, end_date) -> str:
     """
-    which in {"opened","closed","merged"}
+    which in {"opened","closed","merged","updated"}
+    "updated" matches every PR opened, closed or merged in the range.
     """
     base = f"repo:{owner}/{repo} is:pr"
     if which == "opened":
@@ -126,20 +245,25 @@ def build_query_pr(owner, repo, which, start_date, end_date) -> str:
         return f"{base} is:closed closed:{start_date}..{end_date}"
     elif which == "merged":
         return f"{base} is:merged merged:{start_date}..{end_date}"
+    elif which == "updated":
+        return f"{base} updated:{start_date}..{end_date}"
     else:
-        raise ValueError("which must be opened|closed|merged")
+        raise ValueError("which must be opened|closed|merged|updated")
 
 def build_query_issue(owner, repo, which, start_date, end_date) -> str:
     """
-    which in {"opened","closed"}
+    which in {"opened","closed","updated"}
+    "updated" matches every issue opened or closed in the range.
     """
     base = f"repo:{owner}/{repo} is:issue"
     if which == "opened":
         return f"{base} created:{start_date}..{end_date}"
     elif which == "closed":
         return f"{base} is:closed closed:{start_date}..{end_date}"
+    elif which == "updated":
+        return f"{base} updated:{start_date}..{end_date}"
     else:
-        raise ValueError("which must be opened|closed")
+        raise ValueError("which must be opened|closed|updated")
 
 def build_query_labeled_issue(owner, repo, label, which, start_date, end_date) -> str:
     """
@@ -151,56 +275,139 @@ def build_query_labeled_issue(owner, repo, label, which, start_date, end_date) -
         return f"{base} created:{start_date}..{end_date}"
     elif which == "closed":
         return f"{base} is:closed closed:{start_date}..{end_date}"
+    elif which == "updated":
+        return f"{base} updated:{start_date}..{end_date}"
     else:
-        raise ValueError("which must be opened|closed")
+        raise ValueError("which must be opened|closed|updated")
 
 # -----------------------------
 # GitHub queries (search/issues, commits, releases)
 # -----------------------------
 
-def search_items(session: requests.Session, q: str, token: Optional[str], max_pages: int = 10, pause: float = 0.5):
+def search_page(session: requests.Session, q: str, page: int) -> dict:
+    # created order never changes, so activity on an item cannot reshuffle the pages
+    r = gh_get(session, "https://api.github.com/search/issues",
+               params={"q": q, "sort": "created", "order": "asc", "per_page": 100, "page": page})
+    r.raise_for_status()
+    return _loads(r)
+
+SEARCH_CAP = 1000
+STABLE_ATTEMPTS = 3
+
+def search_many(pool: ThreadPoolExecutor, session: requests.Session, builders: list,
+                ranges: list, max_pages: int = 10) -> list:
     """
-    Use GitHub Search API (issues/PRs). Returns list of items.
+    Use GitHub Search API (issues/PRs) for several query builders at once.
+    Each builder(start, end) is searched over every (start, end) date range;
+    returns one list of items per builder, in builder order.
+    Page 1 of every query is fetched concurrently. A range whose total_count
+    exceeds the 1000-result cap is split in half and retried, so ranges are
+    only as fine as each query's volume needs; accepted ranges keep their
+    page 1 and fetch further pages in one more concurrent round.
+    If a query's total_count changes between its pages, items moved in or out
+    while it was paged and later offsets may have skipped one, so it is paged
+    again (up to STABLE_ATTEMPTS); the repeats overlap, so callers dedupe by number.
     Honours 1000 results cap via max_pages (100 per page).
     """
-    url = "https://api.github.com/search/issues"
-    params = {"q": q, "per_page": 100, "page": 1}
-    items = []
-    for page in range(1, max_pages + 1):
-        params["page"] = page
-        r = session.get(url, params=params, timeout=30)
-        if r.status_code == 422:
-            r.raise_for_status()
-        r.raise_for_status()
-        data = r.json()
-        batch = data.get("items", [])
-        items.extend(batch)
-        if len(batch) < 100:
+    one_day = timedelta(days=1)
+    pending = [(i, s, e) for i in range(len(builders)) for s, e in ranges]
+    accepted = []  # (builder index, query, page 1 payload)
+    while pending:
+        queries = [builders[i](s, e) for i, s, e in pending]
+        firsts = pool.map(lambda q: search_page(session, q, 1), queries)
+        split = []
+        for (i, s, e), q, data in zip(pending, queries, firsts):
+            if data.get("total_count", 0) > SEARCH_CAP and s < e:
+                mid = s + (e - s) // 2
+                split += [(i, s, mid), (i, mid + one_day, e)]
+            else:
+                accepted.append((i, q, data))
+        pending = split
+
+    results = [[] for _ in builders]
+    for _ in range(STABLE_ATTEMPTS):
+        rest = []
+        totals = []
+        for k, (i, q, data) in enumerate(accepted):
+            results[i].extend(data.get("items", []))
+            totals.append({data.get("total_count", 0)})
+            n_pages = min(max_pages, -(-data.get("total_count", 0) // 100))
+            rest += [(k, q, page) for page in range(2, n_pages + 1)]
+        pages = pool.map(lambda r: search_page(session, r[1], r[2]), rest)
+        for (k, _, _), data in zip(rest, pages):
+            results[accepted[k][0]].extend(data.get("items", []))
+            totals[k].add(data.get("total_count", 0))
+        unstable = [(i, q) for (i, q, _), seen in zip(accepted, totals) if len(seen) > 1]
+        if not unstable:
             break
-        time.sleep(pause)
-    return items
-
-def list_commits(session: requests.Session, owner: str, repo: str, since_iso: str, until_iso: str):
+        firsts = pool.map(lambda r: search_page(session, r[1], 1), unstable)
+        accepted = [(i, q, data) for (i, q), data in zip(unstable, firsts)]
+    return results
+
+def split_off_last_day(ranges: list) -> Tuple[list, list]:
+    """Split ranges into (everything before the last day, [(last day, last day)])."""
+    *earlier, (s, e) = ranges
+    if s < e:
+        earlier.append((s, e - timedelta(days=1)))
+    return earlier, [(e, e)]
+
+def graphql_merged_at(session: requests.Session, owner: str, repo: str, numbers: list) -> Dict[int, Optional[str]]:
+    """Return {number: merged_at} for up to GRAPHQL_BATCH PRs in a single GraphQL query."""
+    fields = " ".join(f"pr{n}: pullRequest(number: {n}) {{ mergedAt }}" for n in numbers)
+    query = f"query($owner: String!, $name: String!) {{ repository(owner: $owner, name: $name) {{ {fields} }} }}"
+    r = gh_request(session, "POST", GRAPHQL_URL,
+                   json={"query": query, "variables": {"owner": owner, "name": repo}})
+    body = _loads(r) if r.status_code == 200 else None
+    repo_data = ((body or {}).get("data") or {}).get("repository")
+    if repo_data is None:
+        err = (body or {}).get("errors") or r.text
+        raise SystemExit(f"GitHub GraphQL error {r.status_code} for PRs #{numbers[0]}..#{numbers[-1]}:\n{err}")
+    return {n: (repo_data.get(f"pr{n}") or {}).get("mergedAt") for n in numbers}
+
+def lookup_merged_at(pool: ThreadPoolExecutor, session: requests.Session, owner: str, repo: str,
+                     numbers: list, ranges: list, token: Optional[str], max_pages: int = 10) -> Dict[int, Optional[str]]:
+    """
+    merged_at for PRs whose search hit lacked it: batched GraphQL lookups with a token.
+    GraphQL needs one, so otherwise a single is:merged search over the window recovers
+    every merge that can land in it; PRs it does not return get None.
+    """
+    if token:
+        batches = [numbers[i:i + GRAPHQL_BATCH] for i in range(0, len(numbers), GRAPHQL_BATCH)]
+        merged_at_by_num = {}
+        for found in pool.map(lambda b: graphql_merged_at(session, owner, repo, b), batches):
+            merged_at_by_num.update(found)
+        return merged_at_by_num
+    wanted = set(numbers)
+    merged_at_by_num = dict.fromkeys(numbers)
+    (found,) = search_many(pool, session, [lambda s, e: build_query_pr(owner, repo, "merged", s, e)],
+                           ranges, max_pages=max_pages)
+    for it in found:
+        if it.get("number") in wanted:
+            merged_at_by_num[it["number"]] = (it.get("pull_request") or {}).get("merged_at") or it.get("closed_at")
+    return merged_at_by_num
+
+def list_commits(session: requests.Session, owner: str, repo: str, since_iso: str, until_iso: str, workers: int = 8):
     """
     List commits via REST (not search), paginated.
     since/until are ISO timestamps like 'YYYY-MM-DDT00:00:00Z'
+    Page 1's rel="last" Link gives the page count; pages 2..N are fetched concurrently.
     """
     url = f"https://api.github.com/repos/{owner}/{repo}/commits"
     params = {"per_page": 100, "since": since_iso, "until": until_iso}
-    commits = []
-    while True:
-        data, links = get_json(session, url, params=params)
-        if not data:
-            break
-        commits.extend(data)
-        if "next" not in links:
-            break
-        url = links["next"]["url"]
-        params = None  # next url already has params
-        time.sleep(0.3)
+    data, links = get_json(session, url, params=params)
+    commits = list(data or [])
+    last = links.get("last", {}).get("url")
+    if data and last:
+        n_pages = int(parse_qs(urlsplit(last).query)["page"][0])
+        # Own pool: this already runs on main()'s pool, and waiting on that pool from inside it could stall
+        with ThreadPoolExecutor(max_workers=workers) as pages_pool:
+            pages = pages_pool.map(lambda page: get_json(session, url, params={**params, "page": page}),
+                                   range(2, n_pages + 1))
+            for page_data, _ in pages:
+                commits.extend(page_data)
     return commits
 
-def list_releases(session: requests.Session, owner: str, repo: str, since_d: date, until_d: date):
+def list_releases(session: requests.Session, owner: str, repo: str, since_d: date, until_d: date, pause: float = 0.3):
     """
     List releases; bucket by month if within window.
     """
@@ -208,9 +415,9 @@ def list_releases(session: requests.Session, owner: str, repo: str, since_d: dat
     params = {"per_page": 100, "page": 1}
     releases = []
     while True:
-        r = session.get(url, params=params, timeout=30)
+        r = gh_get(session, url, params=params)
         r.raise_for_status()
-        data = r.json()
+        data = _loads(r)
         if not isinstance(data, list):
             break
         releases.extend(data)
@@ -220,7 +427,7 @@ def list_releases(session: requests.Session, owner: str, repo: str, since_d: dat
             url = link["next"]["url"]
         else:
             break
-        time.sleep(0.3)
+        time.sleep(pause)
     # filter to window using published_at or created_at
     out = []
     for rel in releases:
@@ -237,6 +444,24 @@ def list_releases(session: requests.Session, owner: str, repo: str, since_d: dat
 # Utilities
 # -----------------------------
 
+def _commit_ts(c: dict) -> Optional[str]:
+    try:
+        return c["commit"]["author"]["date"]
+    except (KeyError, TypeError):
+        return None
+
+def _commit_login(c: dict) -> Optional[str]:
+    try:
+        return c["author"]["login"]
+    except (KeyError, TypeError):
+        return None
+
+def _commit_email(c: dict) -> Optional[str]:
+    try:
+        return c["commit"]["author"]["email"]
+    except (KeyError, TypeError):
+        return None
+
 def slugify_label(label: str) -> str:
     """
     Convert a label into a safe, readable filename slug:
@@ -254,9 +479,15 @@ def main():
     ap.add_argument("--repo", required=True)
     ap.add_argument("--since-days", type=int, default=90, help="Lookback window in days (default 90)")
     ap.add_argument("--out-dir", default=".", help="Directory to write CSVs")
-    ap.add_argument("--chunk-days", type=int, default=30, help="Search chunk size in days (default 30)")
+    ap.add_argument("--chunk-days", type=int, default=None,
+                    help="Optional initial search chunk size in days; ranges over the 1000-result cap are split automatically")
     ap.add_argument("--max-pages", type=int, default=10, help="Max search pages (100 results each)")
-    ap.add_argument("--pause", type=float, default=0.5, help="Pause between search pages (seconds)")
+    ap.add_argument("--pause", type=float, default=None,
+                    help="Deprecated for searches, which are throttled by --workers and rate-limit backoff; "
+                         "now only the seconds to sleep between release list pages (default 0.3)")
+    ap.add_argument("--workers", type=int, default=8, help="Max concurrent GitHub API requests")
+    ap.add_argument("--http-cache", metavar="PATH",
+                    help="Cache GitHub responses in this SQLite file and revalidate them with ETags (requires requests-cache)")
 
     # Back-compat: old single-label arg (used if --labels not provided)
     ap.add_argument("--enhancement-label", default="enhancement",
@@ -266,6 +497,11 @@ def main():
                     help="Comma-separated list of labels to export (exact label text). Example: \"enhancement,Major decision pending\"")
 
     args = ap.parse_args()
+    if args.pause is not None:
+        print("warning: --pause no longer throttles searches and only sets the sleep between release list pages; "
+              "use --workers to limit concurrency", file=sys.stderr)
+    else:
+        args.pause = 0.3
 
     token = os.getenv("GITHUB_TOKEN")
     if not os.path.isdir(args.out_dir):
@@ -276,112 +512,113 @@ def main():
     since_iso = f"{start_d}T00:00:00Z"
     until_iso = f"{end_d}T23:59:59Z"
 
-    with make_session(token) as session:
-        # ----- PRs: opened/closed/merged (weekly) -----
-        for which in ("opened", "closed", "merged"):
-            weekly = defaultdict(int)
-            for s, e in daterange_chunks(start_d, end_d, args.chunk_days):
-                q = build_query_pr(args.owner, args.repo, which, s, e)
-                items = search_items(session, q, token, max_pages=args.max_pages, pause=args.pause)
-                for it in items:
-                    if which == "opened":
-                        ts = it.get("created_at")
-                    elif which == "closed":
-                        ts = it.get("closed_at")
-                    else:  # merged
-                        # merged_at can be on top-level or under pull_request
-                        ts = it.get("merged_at") or it.get("pull_request", {}).get("merged_at") or it.get("closed_at")
-                    if not ts:
-                        continue
-                    dt = parse_iso_z(ts)
-                    key = monday_bucket(dt)
-                    weekly[key] += 1
-            write_csv(os.path.join(args.out_dir, f"prs_{which}_weekly.csv"), weekly)
-
-        # ----- Issues: opened/closed (weekly) -----
-        for which in ("opened", "closed"):
-            weekly = defaultdict(int)
-            for s, e in daterange_chunks(start_d, end_d, args.chunk_days):
-                q = build_query_issue(args.owner, args.repo, which, s, e)
-                items = search_items(session, q, token, max_pages=args.max_pages, pause=args.pause)
-                for it in items:
-                    ts = it.get("created_at") if which == "opened" else it.get("closed_at")
-                    if not ts:
-                        continue
-                    dt = parse_iso_z(ts)
-                    key = monday_bucket(dt)
-                    weekly[key] += 1
-            write_csv(os.path.join(args.out_dir, f"issues_{which}_weekly.csv"), weekly)
-
-        # ----- Label-specific issues (weekly for each label) -----
-        labels_arg = args.labels.strip()
-        labels = []
-        if labels_arg:
-            labels = [x.strip() for x in labels_arg.split(",") if x.strip()]
-        else:
-            # Back-compat path: just use the single enhancement label
-            labels = [args.enhancement_label]
-
-        for label in labels:
-            for which in ("opened", "closed"):
-                weekly = defaultdict(int)
-                for s, e in daterange_chunks(start_d, end_d, args.chunk_days):
-                    q = build_query_labeled_issue(args.owner, args.repo, label, which, s, e)
-                    items = search_items(session, q, token, max_pages=args.max_pages, pause=args.pause)
-                    for it in items:
-                        ts = it.get("created_at") if which == "opened" else it.get("closed_at")
-                        if not ts:
-                            continue
-                        dt = parse_iso_z(ts)
-                        key = monday_bucket(dt)
-                        weekly[key] += 1
-                # Write one CSV per label+which with clean Monday-UTC labels
-                fname = f"label-{slugify_label(label)}_{which}_weekly.csv"
-                write_csv(os.path.join(args.out_dir, fname), weekly)
+    labels_arg = args.labels.strip()
+    labels = []
+    if labels_arg:
+        labels = [x.strip() for x in labels_arg.split(",") if x.strip()]
+    else:
+        # Back-compat path: just use the single enhancement label
+        labels = [args.enhancement_label]
+
+    if args.chunk_days:
+        ranges = [(date.fromisoformat(s), date.fromisoformat(e))
+                  for s, e in daterange_chunks(start_d, end_d, args.chunk_days)]
+    else:
+        ranges = [(start_d, end_d)]
+    # One "updated" search per range covers every opened/closed(/merged) metric of a
+    # group: anything created, closed or merged in the window was updated in it too.
+    # (csv filename prefix, query builder, is_pr) per group
+    owner, repo = args.owner, args.repo
+    groups = [
+        ("prs", lambda s, e: build_query_pr(owner, repo, "updated", s, e), True),
+        ("issues", lambda s, e: build_query_issue(owner, repo, "updated", s, e), False),
+    ]
+    for label in labels:
+        groups.append((f"label-{slugify_label(label)}",
+                       lambda s, e, label=label: build_query_labeled_issue(owner, repo, label, "updated", s, e),
+                       False))
+
+    lo, hi = start_d.isoformat(), end_d.isoformat()
+    # C-level column getters, so per-item extraction never enters Python code
+    created_at, merged_at = methodcaller("get", "created_at"), methodcaller("get", "merged_at")
+
+    with make_session(token, args.workers, args.http_cache) as session, ThreadPoolExecutor(max_workers=args.workers) as pool:
+        # Commit and release listings are independent of the searches; start them first.
+        commits_f = pool.submit(list_commits, session, args.owner, args.repo, since_iso, until_iso, args.workers)
+        rels_f = pool.submit(list_releases, session, args.owner, args.repo, start_d, end_d, args.pause)
+
+        # ----- PRs opened/closed/merged, issues opened/closed, label-specific issues (weekly) -----
+        # Activity during the run moves an item's updated_at into today, so today is searched
+        # only after every earlier range is done: an item that leaves one of those ranges is
+        # still found there rather than lost.
+        builders = [build for _, build, _ in groups]
+        earlier, today = split_off_last_day(ranges)
+        results = search_many(pool, session, builders, earlier, max_pages=args.max_pages) if earlier else [[] for _ in builders]
+        for found, late in zip(results, search_many(pool, session, builders, today, max_pages=args.max_pages)):
+            found.extend(late)
+        for (prefix, _, is_pr), found in zip(groups, results):
+            # keyed by number: a moved item, or a re-paged range, can return the same item twice
+            items = list({it["number"]: it for it in found}.values())
+            # One CSV per group+which with clean Monday-UTC labels
+            write_csv(os.path.join(args.out_dir, f"{prefix}_opened_weekly.csv"),
+                      count_weekly(map(created_at, items), lo, hi))
+            # reopened items can keep closed_at; state stands in for the old is:closed filter
+            write_csv(os.path.join(args.out_dir, f"{prefix}_closed_weekly.csv"),
+                      count_weekly((it.get("closed_at") for it in items if it.get("state") == "closed"), lo, hi))
+            if not is_pr:
+                continue
+            # Search results carry pull_request.merged_at; only look a PR up when the
+            # field is missing altogether (null means the PR was closed unmerged).
+            prs = [it.setdefault("pull_request", {}) for it in items]
+            missing = [(pr, it["number"]) for pr, it in zip(prs, items)
+                       if "merged_at" not in pr and it.get("closed_at")]
+            if missing:
+                looked_up = lookup_merged_at(pool, session, args.owner, args.repo, [n for _, n in missing],
+                                             ranges, token, max_pages=args.max_pages)
+                for pr, n in missing:
+                    pr["merged_at"] = looked_up[n]
+            write_csv(os.path.join(args.out_dir, f"{prefix}_merged_weekly.csv"),
+                      count_weekly(map(merged_at, prs), lo, hi))
 
         # ----- Commits + Contributors (weekly) -----
-        commits = list_commits(session, args.owner, args.repo, since_iso, until_iso)
+        commits = commits_f.result()
 
-        # Commits per week
-        commits_weekly = defaultdict(int)
-        # Unique contributors per week (by author.login or commit author email)
-        contributors_weekly_sets = defaultdict(set)
+        # Commits per week (week keys collected here, counted by Counter below)
+        commit_weeks = []
+        # Unique contributors per week (by author.login or commit author email),
+        # kept as one flat set of (week, ident) pairs rather than a set per week
+        contributor_weeks = set()
 
         for c in commits:
-            ts = (c.get("commit", {}) or {}).get("author", {}).get("date")
+            ts = _commit_ts(c)
             if not ts:
                 continue
-            dt = parse_iso_z(ts)
-            if not (start_d <= dt.date() <= end_d):
+            # same date-prefix window check as count_weekly; week_of parses on a cache miss
+            if not (lo <= ts[:10] <= hi):
                 continue
-            wk = monday_bucket(dt)
-            commits_weekly[wk] += 1
+            wk = week_of(ts)
+            commit_weeks.append(wk)
 
             # contributor identity
-            login = (c.get("author") or {}).get("login")
+            login = _commit_login(c)
             if login:
                 ident = f"login:{login}"
             else:
-                email = (c.get("commit", {}) or {}).get("author", {}).get("email")
+                email = _commit_email(c)
                 ident = f"email:{email}" if email else "unknown"
-            contributors_weekly_sets[wk].add(ident)
+            # the same identity recurs across thousands of commits; share one str object
+            contributor_weeks.add((wk, sys.intern(ident)))
 
-        write_csv(os.path.join(args.out_dir, "commits_weekly.csv"), commits_weekly)
+        write_csv(os.path.join(args.out_dir, "commits_weekly.csv"), Counter(commit_weeks))
 
-        # Convert contributor sets -> counts
-        contributors_weekly = {k: len(v) for k, v in contributors_weekly_sets.items()}
+        # Convert (week, ident) pairs -> counts
+        contributors_weekly = Counter(wk for wk, _ in contributor_weeks)
         write_csv(os.path.join(args.out_dir, "contributors_weekly.csv"), contributors_weekly)
 
         # ----- Releases (monthly) -----
-        rels = list_releases(session, args.owner, args.repo, start_d, end_d)
-        releases_monthly = defaultdict(int)
-        for rel in rels:
-            ts = rel.get("published_at") or rel.get("created_at")
-            if not ts:
-                continue
-            dt = parse_iso_z(ts)
-            key = month_bucket(dt)
-            releases_monthly[key] += 1
+        rels = rels_f.result()
+        stamps = (rel.get("published_at") or rel.get("created_at") for rel in rels)
+        releases_monthly = Counter(month_bucket(parse_iso_z(ts)) for ts in stamps if ts)
         write_csv(os.path.join(args.out_dir, "releases_monthly.csv"), releases_monthly)
 
 
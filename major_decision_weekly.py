@@ -5,62 +5,210 @@
 #   data/label-major-decision-pending_opened_weekly.csv
 #   data/label-major-decision-pending_closed_weekly.csv
 
-import os, csv, time, argparse, requests
+import os, time, argparse, threading, requests
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, date, timedelta, timezone
 
+try:
+    import orjson as _json
+except ImportError:  # orjson is optional; stdlib json parses the same payloads, just slower
+    import json as _json
+
+try:
+    import requests_cache
+except ImportError:  # optional; only needed for --http-cache
+    requests_cache = None
+
 LABEL_TEXT = "major-decision-pending"
+GRAPHQL_URL = "https://api.github.com/graphql"
+PER_PAGE = 100
+MAX_PAGES = 10  # search serves at most 1000 results
+IO_BUFFER = 1 << 20
+MAX_RETRIES = 5
+CACHE_TTL = 3600
+
+SEARCHES_PER_QUERY = 10  # weekly searches aliased into one GraphQL operation
+MAX_WORKERS = 4  # operations in flight at once
 
-def parse_iso_z(ts: str) -> datetime:
-    return datetime.strptime(ts, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+PAGE_FRAGMENT = """
+fragment page on SearchResultItemConnection {
+  pageInfo { endCursor hasNextPage }
+  nodes { ... on Issue { number createdAt closedAt state } }
+}
+"""
+KINDS = ("opened", "closed")
+HEADERS = {"User-Agent": "major-decision-weekly/1.0"}
 
-def monday_bucket(dt: datetime) -> date:
-    d = dt.date()
-    return d - timedelta(days=d.weekday())
+def count_weekly(per_day: Counter) -> Counter:
+    """Fold per-day ("YYYY-MM-DD") counts into Monday buckets; there are only a few distinct days."""
+    weekly = Counter()
+    for day, n in per_day.items():
+        d = date.fromisoformat(day)
+        weekly[d - timedelta(days=d.weekday())] += n
+    return weekly
 
 def write_csv(path: str, counter: dict):
     rows = sorted(counter.items())
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        w.writerow(["time", "count"])
-        for k, v in rows:
-            dt = datetime(k.year, k.month, k.day, 0, 0, 0, tzinfo=timezone.utc)
-            w.writerow([dt.strftime("%Y-%m-%dT00:00:00Z"), v])
+    # Two fields that never need quoting (ISO date, int), so the rows are joined directly;
+    # \r\n keeps the output identical to what csv.writer produced.
+    body = "".join(f"{k.isoformat()}T00:00:00Z,{v}\r\n" for k, v in rows)
+    with open(path, "w", newline="", encoding="utf-8", buffering=IO_BUFFER) as f:
+        f.write("time,count\r\n" + body)
     print(f"Wrote {len(rows)} rows to {path}")
 
-def search_label(owner: str, repo: str, which: str, start: date, end: date, token: str):
-    base = f'repo:{owner}/{repo} is:issue label:"{LABEL_TEXT}"'
-    if which == "opened":
-        q = f"{base} created:{start.isoformat()}..{end.isoformat()}"
-        ts_field = "created_at"
+def _loads(r: requests.Response):
+    return _json.loads(r.content)
+
+def _cacheable(r: requests.Response) -> bool:
+    """GraphQL errors (rate limits included) arrive as 200s; only clean data is worth replaying."""
+    try:
+        body = _loads(r)
+    except ValueError:
+        return False
+    return isinstance(body, dict) and not body.get("errors") and body.get("data") is not None
+
+def make_session(token: str, cache_path: str | None = None) -> requests.Session:
+    if cache_path:
+        if requests_cache is None:
+            raise SystemExit("--http-cache requires the requests-cache package (pip install requests-cache)")
+        # The GraphQL endpoint sends no ETag to revalidate against, so cached POSTs (keyed
+        # by query and variables) are simply reused until they expire.
+        sess = requests_cache.CachedSession(cache_path, backend="sqlite", allowable_methods=("POST",),
+                                            expire_after=CACHE_TTL, filter_fn=_cacheable)
     else:
-        q = f"{base} is:closed closed:{start.isoformat()}..{end.isoformat()}"
-        ts_field = "closed_at"
-
-    url = "https://api.github.com/search/issues"
-    headers = {
-        "Accept": "application/vnd.github+json",
-        "User-Agent": "major-decision-weekly/1.0",
-        "Authorization": f"Bearer {token}",
-    }
-    params = {"q": q, "per_page": 100, "page": 1}
-
-    items = []
-    while True:
-        r = requests.get(url, headers=headers, params=params, timeout=30)
-        if r.status_code == 403:
-            print("Hit rate limit; pausing 5s…")
-            time.sleep(5)
-            continue
-        r.raise_for_status()
-        data = r.json()
-        page_items = data.get("items", [])
-        items.extend(page_items)
-        if len(page_items) < 100:
+        sess = requests.Session()
+    sess.headers.update(HEADERS)
+    sess.headers["Authorization"] = f"Bearer {token}"
+    return sess
+
+def graphql_rate_limited(r: requests.Response) -> bool:
+    """GraphQL reports an exhausted limit as HTTP 200 with errors[].type == "RATE_LIMITED"."""
+    if b"RATE_LIMITED" not in r.content and r.headers.get("X-RateLimit-Remaining") != "0":
+        return False
+    try:
+        errors = _loads(r).get("errors") or []
+    except (ValueError, AttributeError):
+        return False
+    # Remaining == 0 on its own is a successful last request; it only counts alongside errors
+    return bool(errors) and (r.headers.get("X-RateLimit-Remaining") == "0"
+                             or any(e.get("type") == "RATE_LIMITED" for e in errors if isinstance(e, dict)))
+
+def is_rate_limited(r: requests.Response) -> bool:
+    if r.status_code == 429:
+        return True
+    if r.status_code != 403:
+        return graphql_rate_limited(r)
+    return ("Retry-After" in r.headers
+            or r.headers.get("X-RateLimit-Remaining") == "0"
+            or "rate limit" in r.text.lower())
+
+def retry_delay(r: requests.Response, attempt: int) -> float:
+    """Seconds to wait before retrying a rate-limited response."""
+    retry_after = r.headers.get("Retry-After")
+    if retry_after:
+        return float(retry_after)
+    reset = r.headers.get("X-RateLimit-Reset")
+    if r.headers.get("X-RateLimit-Remaining") == "0" and reset:
+        return max(0.0, int(reset) - time.time()) + 1
+    return min(2 ** attempt, 60)
+
+def gh_post(sess: requests.Session, body: dict) -> requests.Response:
+    """POST to GraphQL, backing off on rate-limit responses (403/429 or RATE_LIMITED); gives up after MAX_RETRIES."""
+    for attempt in range(MAX_RETRIES + 1):
+        r = sess.post(GRAPHQL_URL, json=body, timeout=30)
+        if attempt == MAX_RETRIES or not is_rate_limited(r):
+            return r
+        delay = retry_delay(r, attempt)
+        print(f"Hit rate limit; pausing {delay:.0f}s…")
+        time.sleep(delay)
+
+def search_query(n: int) -> str:
+    """Operation with n aliased searches s0..s{n-1}, each paged by its own cursor a{i}."""
+    params = ", ".join(f"$q{i}: String!, $a{i}: String" for i in range(n))
+    body = "\n".join(
+        f"  s{i}: search(query: $q{i}, type: ISSUE, first: {PER_PAGE}, after: $a{i}) {{ ...page }}" for i in range(n))
+    return f"query({params}) {{\n{body}\n}}\n{PAGE_FRAGMENT}"
+
+# Every batch size an operation can carry, built once; a batch only shrinks as its searches run out of pages
+SEARCH_QUERIES = [""] + [search_query(n) for n in range(1, SEARCHES_PER_QUERY + 1)]
+
+def week_windows(start: date, end: date):
+    """(lo, hi) inclusive date ranges covering start..end, split at Monday boundaries."""
+    lo = start
+    while lo <= end:
+        hi = min(end, lo + timedelta(days=6 - lo.weekday()))
+        yield lo, hi
+        lo = hi + timedelta(days=1)
+
+def search_batch(sess: requests.Session, searches: list, stop: threading.Event) -> list:
+    """Page every search query in one aliased operation until all are exhausted; returns the issue nodes."""
+    cursors = [None] * len(searches)
+    pending = list(range(len(searches)))
+    found = []
+    for _ in range(MAX_PAGES):
+        # another batch failed; the run is over, so stop spending requests
+        if not pending or stop.is_set():
             break
-        params["page"] += 1
-        time.sleep(0.5)
-    return items, ts_field
+        variables = {}
+        for j, i in enumerate(pending):
+            variables[f"q{j}"] = searches[i]
+            variables[f"a{j}"] = cursors[i]
+        r = gh_post(sess, {"query": SEARCH_QUERIES[len(pending)], "variables": variables})
+        r.raise_for_status()
+        payload = _loads(r)
+        if payload.get("errors"):
+            raise SystemExit(f"GitHub GraphQL error: {payload['errors']}")
+
+        still = []
+        for j, i in enumerate(pending):
+            conn = payload["data"][f"s{j}"]
+            found.extend(n for n in conn["nodes"] if n)
+            info = conn["pageInfo"]
+            if info["hasNextPage"]:
+                cursors[i] = info["endCursor"]
+                still.append(i)
+        pending = still
+    return found
+
+def search_label(sess: requests.Session, owner: str, repo: str, start: date, end: date):
+    """Yield ("opened" | "closed", timestamp) for the label, one batch of weekly searches at a time."""
+    base = f'repo:{owner}/{repo} is:issue label:"{LABEL_TEXT}"'
+    # Anything opened or closed in the window was last updated inside it too, so one updated:
+    # search per week finds both sides. Weekly slices keep each search well under the
+    # 1000-result cap, usually on a single page.
+    searches = [f"{base} updated:{lo.isoformat()}..{hi.isoformat()}" for lo, hi in week_windows(start, end)]
+    first, last = start.isoformat(), end.isoformat()
+    # An issue touched mid-run jumps into the newest week: search that week only after the
+    # older ones are done so the move cannot hide it, and dedupe on number so it is not counted twice.
+    older, newest = searches[:-1], searches[-1:]
+    rounds = [[older[i:i + SEARCHES_PER_QUERY] for i in range(0, len(older), SEARCHES_PER_QUERY)], [newest]]
+    seen = set()
+    stop = threading.Event()
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        for batches in rounds:
+            # Counting is order-independent, so each batch is folded in as soon as it lands; no list
+            # of futures is kept, and as_completed drops each one once yielded, freeing its nodes
+            for fut in as_completed([pool.submit(search_batch, sess, b, stop) for b in batches]):
+                try:
+                    found = fut.result()
+                except BaseException:
+                    stop.set()
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    raise
+                for n in found:
+                    num = n.get("number")
+                    if num in seen:
+                        continue
+                    seen.add(num)
+                    created, closed = n.get("createdAt"), n.get("closedAt")
+                    if created and first <= created[:10] <= last:
+                        yield "opened", created
+                    # reopened issues are excluded, as is:closed did before
+                    if closed and n.get("state") == "CLOSED" and first <= closed[:10] <= last:
+                        yield "closed", closed
 
 def main():
     ap = argparse.ArgumentParser(description="Weekly CSVs for the 'Major decision pending' label")
@@ -68,6 +216,8 @@ def main():
     ap.add_argument("--repo", required=True)
     ap.add_argument("--since-days", type=int, default=180)
     ap.add_argument("--out-dir", default="data")
+    ap.add_argument("--http-cache", metavar="PATH",
+                    help=f"Cache GitHub responses in this SQLite file for {CACHE_TTL // 60} minutes (requires requests-cache)")
     args = ap.parse_args()
 
     token = os.getenv("GITHUB_TOKEN")
@@ -77,26 +227,16 @@ def main():
     end = datetime.now(timezone.utc).date()
     start = end - timedelta(days=args.since_days)
 
-    # Opened
-    opened_items, opened_field = search_label(args.owner, args.repo, "opened", start, end, token)
-    opened_weekly = {}
-    for it in opened_items:
-        ts = it.get(opened_field)
-        if ts:
-            dt = parse_iso_z(ts)
-            wk = monday_bucket(dt)
-            opened_weekly[wk] = opened_weekly.get(wk, 0) + 1
+    # Only per-day tallies (and search_label's set of seen issue numbers) outlive each page
+    per_day = {which: Counter() for which in KINDS}
+    with make_session(token, args.http_cache) as sess:
+        for which, ts in search_label(sess, args.owner, args.repo, start, end):
+            per_day[which][ts[:10]] += 1
+
+    opened_weekly = count_weekly(per_day["opened"])
     write_csv(os.path.join(args.out_dir, "label-major-decision-pending_opened_weekly.csv"), opened_weekly)
 
-    # Closed
-    closed_items, closed_field = search_label(args.owner, args.repo, "closed", start, end, token)
-    closed_weekly = {}
-    for it in closed_items:
-        ts = it.get(closed_field)
-        if ts:
-            dt = parse_iso_z(ts)
-            wk = monday_bucket(dt)
-            closed_weekly[wk] = closed_weekly.get(wk, 0) + 1
+    closed_weekly = count_weekly(per_day["closed"])
     write_csv(os.path.join(args.out_dir, "label-major-decision-pending_closed_weekly.csv"), closed_weekly)
 
 if __name__ == "__main__":